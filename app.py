@@ -5,7 +5,8 @@ Indexing & Retrieval, Augmentation, and Generation.
 """
 
 import streamlit as st
-from src.core import initialize_session_state
+from src.config import MODEL_OPTIONS
+from src.core import initialize_session_state, warm_model
 from src.ui import CUSTOM_CSS
 from src.ui.components import (
     render_sidebar,
@@ -34,6 +35,10 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 # Initialize session state
 initialize_session_state()
 
+# Warm the default (local) embedding model in the background so the first
+# "Generate Embeddings" click doesn't pay model load + first forward pass
+warm_model(next(iter(MODEL_OPTIONS.values())))
+
 
 def main():
     """Main application entry point"""
@@ -73,7 +78,7 @@ def main():
         st.divider()
         render_stats_section(reduction_method)
         st.divider()
-        render_visualization_section(reduction_method, model_name)
+        render_visualization_section(reduction_method)
         st.divider()
         render_chunk_explorer()
     
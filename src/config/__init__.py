@@ -3,6 +3,7 @@
 from .settings import (
     MODEL_OPTIONS,
     SAMPLE_TEXTS,
+    QUANTIZE_LOCAL_MODEL,
     DEFAULT_CHUNK_SIZE,
     DEFAULT_OVERLAP,
     DEFAULT_COLLECTION_NAME,
@@ -16,6 +17,7 @@ from .settings import (
 __all__ = [
     'MODEL_OPTIONS',
     'SAMPLE_TEXTS',
+    'QUANTIZE_LOCAL_MODEL',
     'DEFAULT_CHUNK_SIZE',
     'DEFAULT_OVERLAP',
     'DEFAULT_COLLECTION_NAME',
@@ -1,6 +1,8 @@
 """Configuration settings for RAG Visualizer"""
 
 import os
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
 
 # Embedding model options (only 2: local fast vs cloud)
@@ -14,33 +16,58 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 
 # Load sample text from data directory
+@lru_cache(maxsize=None)
 def load_sample_text(filename: str) -> str:
-    """Load sample text from data directory
-    
+    """Load sample text from data directory (cached after first read)
+
     Args:
         filename: Name of the text file in data directory
-        
+
     Returns:
         Content of the file as string
     """
     file_path = DATA_DIR / filename
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        # Single read + single decode, no line-by-line buffering
+        return file_path.read_bytes().decode('utf-8')
     except FileNotFoundError:
         return f"Error: File {filename} not found in data directory."
     except Exception as e:
         return f"Error loading {filename}: {str(e)}"
 
 
-# Sample texts loaded from files
-SAMPLE_TEXTS = {
-    "AI & Machine Learning": load_sample_text("AI_Machine_Learning.txt"),
-    "Climate & Environment": load_sample_text("Climate_Environment.txt"),
-    "Space Exploration": load_sample_text("Space_Exploration.txt"),
-    "Elon Musk Biography": load_sample_text("Elon_Musk_Overview.txt"),
-    "LangGraph Framework": load_sample_text("LangGraph_Overview.txt")
-}
+class _LazySampleTexts(Mapping):
+    """Mapping of sample label -> file contents, read on first access
+
+    Keeps Streamlit cold start from paying I/O for samples the user
+    never opens; load_sample_text caches each file after the first read.
+    """
+
+    def __init__(self, files: dict):
+        self._files = files
+
+    def __getitem__(self, label: str) -> str:
+        return load_sample_text(self._files[label])
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+# Sample texts loaded lazily from files
+SAMPLE_TEXTS = _LazySampleTexts({
+    "AI & Machine Learning": "AI_Machine_Learning.txt",
+    "Climate & Environment": "Climate_Environment.txt",
+    "Space Exploration": "Space_Exploration.txt",
+    "Elon Musk Biography": "Elon_Musk_Overview.txt",
+    "LangGraph Framework": "LangGraph_Overview.txt"
+})
+
+# Quantize local SentenceTransformer weights (fp16 on GPU, int8 on CPU)
+# for faster, lower-memory encoding at negligible similarity drift
+QUANTIZE_LOCAL_MODEL = True
 
 # Default values for the RAG pipeline
 DEFAULT_CHUNK_SIZE = 100
@@ -1,22 +1,36 @@
-"""Core functionality package"""
+"""Core functionality package
 
-from .models import load_model
-from .text_processing import chunk_text
-from .vector_store import create_chromadb_collection
-from .visualization import reduce_dimensions, create_3d_plot
-from .session_state import initialize_session_state, reset_embeddings_state
-from .llm import generate_response, construct_rag_prompt, validate_api_key
+Re-exports are resolved lazily (PEP 562) so importing src.core does not
+pull in the heavy dependencies behind every submodule (torch,
+sentence_transformers, chromadb, plotly, umap, ...) at Streamlit cold
+start — each is imported the first time its function is actually used.
+"""
 
-__all__ = [
-    'load_model',
-    'chunk_text',
-    'create_chromadb_collection',
-    'reduce_dimensions',
-    'create_3d_plot',
-    'initialize_session_state',
-    'reset_embeddings_state',
-    'generate_response',
-    'construct_rag_prompt',
-    'validate_api_key'
-]
+from importlib import import_module
 
+# Public name -> submodule that provides it
+_EXPORTS = {
+    'load_model': 'models',
+    'warm_model': 'warmup',
+    'chunk_text': 'text_processing',
+    'create_chromadb_collection': 'vector_store',
+    'reduce_dimensions': 'visualization',
+    'create_3d_plot': 'visualization',
+    'initialize_session_state': 'session_state',
+    'reset_embeddings_state': 'session_state',
+    'generate_response': 'llm',
+    'construct_rag_prompt': 'llm',
+    'validate_api_key': 'llm',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        submodule = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{submodule}", __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
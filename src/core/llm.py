@@ -1,23 +1,43 @@
-"""LLM integration for RAG generation using LangChain OpenAI"""
+"""LLM integration for RAG generation using the OpenAI SDK"""
 
+import asyncio
+import hashlib
+import io
 import os
 import streamlit as st
+from functools import lru_cache
 from typing import List, Dict, Optional
+import httpx
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from openai import OpenAI, AsyncOpenAI
 
 from src.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_SYSTEM_PROMPT
 
 # Load environment variables (for local development)
 load_dotenv()
 
+# Cap on concurrent in-flight chat completion requests
+MAX_CONCURRENT_REQUESTS = 8
+
+# Separator band between prompt sections, built once at import
+PROMPT_SEPARATOR = "=" * 80
+
+# In-process response cache keyed by a digest of (model, prompts);
+# repeated identical queries skip the API entirely
+_RESPONSE_CACHE: Dict[str, Dict[str, any]] = {}
+_RESPONSE_CACHE_MAX = 128
+
+
+def _response_cache_key(model: str, system_prompt: str, user_message: str) -> str:
+    payload = f"{model}\x00{system_prompt}\x00{user_message}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 
 def get_api_key() -> Optional[str]:
     """Get OpenAI API key from environment or Streamlit secrets
-    
+
     Supports both local .env files and Streamlit Cloud secrets
-    
+
     Returns:
         API key if found, None otherwise
     """
@@ -31,7 +51,7 @@ def get_api_key() -> Optional[str]:
 
 def validate_api_key() -> None:
     """Validate that OpenAI API key is configured
-    
+
     Raises:
         ValueError: If OPENAI_API_KEY is not found
     """
@@ -39,62 +59,73 @@ def validate_api_key() -> None:
         raise ValueError("OPENAI_API_KEY not found in environment variables or Streamlit secrets")
 
 
-def get_llm(model: str = None, temperature: float = None) -> ChatOpenAI:
-    """Get LangChain ChatOpenAI instance
-    
-    Args:
-        model: OpenAI model to use
-        temperature: Temperature for generation
-        
+@lru_cache(maxsize=None)
+def _cached_client(api_key: str) -> OpenAI:
+    """One client per API key so TCP/TLS connections persist across reruns.
+
+    The explicit httpx pool keeps connections alive between calls —
+    without it every fresh client pays a new TLS handshake per request.
+    """
+    return OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=60.0
+        )
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """Get a shared OpenAI client instance
+
     Returns:
-        Configured ChatOpenAI instance
+        Configured OpenAI client
+
+    Raises:
+        ValueError: If OPENAI_API_KEY is not found
     """
-    if model is None:
-        model = DEFAULT_MODEL
-    if temperature is None:
-        temperature = DEFAULT_TEMPERATURE
     api_key = get_api_key()
     if not api_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables or Streamlit secrets")
-    
-    return ChatOpenAI(
-        model=model,
-        temperature=temperature,
-        api_key=api_key,
-        max_tokens=1000
-    )
+    return _cached_client(api_key)
 
 
 def construct_rag_prompt(query: str, retrieved_chunks: List[str], system_prompt: str = None) -> Dict[str, any]:
     """Construct augmented prompt with retrieved context
-    
+
     Args:
         query: User query
         retrieved_chunks: List of retrieved text chunks
         system_prompt: Optional custom system prompt
-        
+
     Returns:
         Dictionary with system_prompt, context, user_query, and full_prompt
     """
     if system_prompt is None:
         system_prompt = DEFAULT_SYSTEM_PROMPT.strip()
-    
-    # Format retrieved context
-    context_text = "\n\n".join([
-        f"[Context {i+1}]:\n{chunk}" 
-        for i, chunk in enumerate(retrieved_chunks)
-    ])
-    
-    # Construct full prompt
-    user_message = f"""Context Information:
-{'='*80}
-{context_text}
-{'='*80}
-
-User Question: {query}
-
-Please answer the question based on the context provided above."""
-    
+
+    # Build the whole prompt in one buffer instead of intermediate
+    # lists/joins — O(total length) with no throwaway allocations
+    buf = io.StringIO()
+    buf.write("Context Information:\n")
+    buf.write(PROMPT_SEPARATOR)
+    buf.write("\n")
+    context_start = buf.tell()
+    for i, chunk in enumerate(retrieved_chunks):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"[Context {i+1}]:\n")
+        buf.write(chunk)
+    context_end = buf.tell()
+    buf.write("\n")
+    buf.write(PROMPT_SEPARATOR)
+    buf.write("\n\nUser Question: ")
+    buf.write(query)
+    buf.write("\n\nPlease answer the question based on the context provided above.")
+
+    user_message = buf.getvalue()
+    context_text = user_message[context_start:context_end]
+
     return {
         "system_prompt": system_prompt,
         "context": context_text,
@@ -105,44 +136,200 @@ Please answer the question based on the context provided above."""
 
 
 def generate_response(query: str, retrieved_chunks: List[str], system_prompt: str = None, model: str = None) -> Dict[str, any]:
-    """Generate response using LangChain OpenAI with retrieved context
-    
+    """Generate response using the OpenAI API with retrieved context
+
     Args:
         query: User query
         retrieved_chunks: List of retrieved text chunks
         system_prompt: Optional custom system prompt
         model: OpenAI model to use
-        
+
     Returns:
         Dictionary with prompt_data and response
     """
     if model is None:
         model = DEFAULT_MODEL
-    llm = get_llm(model=model, temperature=DEFAULT_TEMPERATURE)
-    
+
     # Construct augmented prompt
     prompt_data = construct_rag_prompt(query, retrieved_chunks, system_prompt)
-    
-    # Create LangChain messages
-    messages = [
-        SystemMessage(content=prompt_data["system_prompt"]),
-        HumanMessage(content=prompt_data["full_user_message"])
-    ]
-    
-    # Call LangChain OpenAI
-    response = llm.invoke(messages)
-    
-    # Extract usage information from response metadata
-    usage_metadata = response.response_metadata.get('token_usage', {})
-    
-    return {
+
+    # Serve repeat queries from the cache instead of re-calling the API
+    cache_key = _response_cache_key(model, prompt_data["system_prompt"], prompt_data["full_user_message"])
+    cached = _RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_openai_client()
+
+    # Call the chat completions API directly
+    response = client.chat.completions.create(
+        model=model,
+        temperature=DEFAULT_TEMPERATURE,
+        max_tokens=1000,
+        messages=[
+            {"role": "system", "content": prompt_data["system_prompt"]},
+            {"role": "user", "content": prompt_data["full_user_message"]}
+        ]
+    )
+
+    usage = response.usage
+
+    result = {
         "prompt_data": prompt_data,
-        "response": response.content,
+        "response": response.choices[0].message.content,
         "model": model,
         "usage": {
-            "prompt_tokens": usage_metadata.get('prompt_tokens', 0),
-            "completion_tokens": usage_metadata.get('completion_tokens', 0),
-            "total_tokens": usage_metadata.get('total_tokens', 0)
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            "total_tokens": usage.total_tokens if usage else 0
         }
     }
 
+    # Bounded insertion-order eviction keeps the cache small
+    if len(_RESPONSE_CACHE) >= _RESPONSE_CACHE_MAX:
+        _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)))
+    _RESPONSE_CACHE[cache_key] = result
+
+    return result
+
+
+def generate_response_stream(query: str, retrieved_chunks: List[str], system_prompt: str = None, model: str = None, result: Dict[str, any] = None):
+    """Stream a response token-by-token using the OpenAI API
+
+    Yields content deltas as they arrive, so the UI can render text while
+    the model is still generating (e.g. via st.write_stream) instead of
+    blocking for the full response.
+
+    Args:
+        query: User query
+        retrieved_chunks: List of retrieved text chunks
+        system_prompt: Optional custom system prompt
+        model: OpenAI model to use
+        result: Optional dict; filled with the same keys generate_response
+            returns once the stream is exhausted
+
+    Yields:
+        Response text fragments in order
+    """
+    if model is None:
+        model = DEFAULT_MODEL
+
+    prompt_data = construct_rag_prompt(query, retrieved_chunks, system_prompt)
+
+    # Serve repeat queries from the cache instead of re-calling the API;
+    # the cached text is yielded whole, which st.write_stream renders fine
+    cache_key = _response_cache_key(model, prompt_data["system_prompt"], prompt_data["full_user_message"])
+    cached = _RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        if result is not None:
+            result.update(cached)
+        yield cached["response"]
+        return
+
+    client = get_openai_client()
+
+    stream = client.chat.completions.create(
+        model=model,
+        temperature=DEFAULT_TEMPERATURE,
+        max_tokens=1000,
+        messages=[
+            {"role": "system", "content": prompt_data["system_prompt"]},
+            {"role": "user", "content": prompt_data["full_user_message"]}
+        ],
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+
+    parts = []
+    usage = None
+    for chunk in stream:
+        # Usage arrives in the final chunk when include_usage is set
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    completed = {
+        "prompt_data": prompt_data,
+        "response": "".join(parts),
+        "model": model,
+        "usage": {
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            "total_tokens": usage.total_tokens if usage else 0
+        }
+    }
+
+    # Only fully-consumed streams reach this point, so a partial response
+    # can never be cached. Bounded insertion-order eviction as above.
+    if len(_RESPONSE_CACHE) >= _RESPONSE_CACHE_MAX:
+        _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)))
+    _RESPONSE_CACHE[cache_key] = completed
+
+    if result is not None:
+        result.update(completed)
+
+
+def generate_responses(queries: List[str], retrieved_chunks_list: List[List[str]], system_prompt: str = None, model: str = None) -> List[Dict[str, any]]:
+    """Generate responses for multiple queries concurrently
+
+    Fires all chat completion requests at once (bounded by a semaphore), so
+    total wall-clock time is roughly one request's latency instead of the sum.
+
+    Args:
+        queries: List of user queries
+        retrieved_chunks_list: Retrieved text chunks for each query
+        system_prompt: Optional custom system prompt (shared by all queries)
+        model: OpenAI model to use
+
+    Returns:
+        List of dictionaries with prompt_data and response, one per query
+    """
+    if model is None:
+        model = DEFAULT_MODEL
+    api_key = get_api_key()
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables or Streamlit secrets")
+
+    prompt_datas = [
+        construct_rag_prompt(query, chunks, system_prompt)
+        for query, chunks in zip(queries, retrieved_chunks_list)
+    ]
+
+    async def _run_all():
+        client = AsyncOpenAI(api_key=api_key)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def _complete(prompt_data):
+            async with semaphore:
+                return await client.chat.completions.create(
+                    model=model,
+                    temperature=DEFAULT_TEMPERATURE,
+                    max_tokens=1000,
+                    messages=[
+                        {"role": "system", "content": prompt_data["system_prompt"]},
+                        {"role": "user", "content": prompt_data["full_user_message"]}
+                    ]
+                )
+
+        return await asyncio.gather(*(_complete(pd) for pd in prompt_datas))
+
+    responses = asyncio.run(_run_all())
+
+    results = []
+    for prompt_data, response in zip(prompt_datas, responses):
+        usage = response.usage
+        results.append({
+            "prompt_data": prompt_data,
+            "response": response.choices[0].message.content,
+            "model": model,
+            "usage": {
+                "prompt_tokens": usage.prompt_tokens if usage else 0,
+                "completion_tokens": usage.completion_tokens if usage else 0,
+                "total_tokens": usage.total_tokens if usage else 0
+            }
+        })
+    return results
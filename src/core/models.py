@@ -1,11 +1,37 @@
 """Model loading and embedding generation (SentenceTransformers + OpenAI)"""
 
+import asyncio
+import base64
+import hashlib
+import os
+import shelve
+import threading
+from pathlib import Path
+
 import numpy as np
 import streamlit as st
+import torch
 from sentence_transformers import SentenceTransformer
 
+from src.config import QUANTIZE_LOCAL_MODEL
 from src.core.llm import get_api_key
 
+# On-disk embedding cache location (one subdirectory per model).
+# Bump the version when encode semantics change (e.g. normalization) so
+# stale rows from an older scheme are never mixed in.
+EMBEDDING_CACHE_DIR = Path.home() / ".cache" / "rag_viz"
+EMBEDDING_CACHE_VERSION = 2
+
+# Tune torch threading once for the Streamlit process. CPU encode
+# throughput scales up to roughly 8 cores; beyond that oversubscription
+# hurts. Interop threads must be set before any parallel work starts, so
+# this runs at import time (module caching makes it once per process).
+torch.set_num_threads(min(os.cpu_count() or 4, 8))
+try:
+    torch.set_num_interop_threads(2)
+except RuntimeError:
+    pass  # parallel work already started; keep torch's default
+
 
 def _is_openai_model(model_name: str) -> bool:
     return model_name.startswith("openai:")
@@ -16,26 +42,242 @@ def _openai_model_id(model_name: str) -> str:
     return model_name.split(":", 1)[1]
 
 
+def _quantize_local_model(model: SentenceTransformer) -> SentenceTransformer:
+    """Quantize SentenceTransformer weights for faster encoding.
+
+    On GPU the weights are cast to fp16; on CPU the transformer's Linear
+    layers get dynamic int8 quantization. Encoding is bandwidth-bound, so
+    halving weight size buys throughput with minimal cosine drift.
+    """
+    if torch.cuda.is_available():
+        return model.half()
+    model[0].auto_model = torch.quantization.quantize_dynamic(
+        model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return model
+
+
+def _load_sentence_transformer(model_name: str) -> SentenceTransformer:
+    """Load the local model, preferring the ONNX Runtime backend.
+
+    The ONNX export happens once per model (then lands in the HuggingFace
+    cache) and runs with graph optimizations enabled — fused LayerNorm,
+    GELU and attention kernels — which is substantially faster than eager
+    PyTorch on CPU. Falls back to the PyTorch backend (optionally
+    quantized) when onnxruntime/optimum are not installed.
+    """
+    try:
+        model = SentenceTransformer(model_name, backend="onnx")
+    except Exception:
+        model = SentenceTransformer(model_name)
+        if QUANTIZE_LOCAL_MODEL:
+            model = _quantize_local_model(model)
+    model.eval()
+    # Chunks here are ~100 words, far under the model's 512-token limit;
+    # capping the sequence length cuts the quadratic attention cost
+    model.max_seq_length = min(model.max_seq_length, 256)
+    return model
+
+
+def _encode_length_sorted(model, texts: list[str], batch_size: int = 32) -> np.ndarray:
+    """Encode texts in length-sorted batches, then restore input order.
+
+    Sorting by length groups similarly-sized texts into the same batch, so
+    each batch only pads to its own longest member instead of the corpus
+    maximum — much less wasted compute in the transformer forward pass.
+
+    Embeddings come back L2-normalized, matching the (already unit-norm)
+    OpenAI embeddings, so downstream cosine distance is a plain dot product.
+    """
+    order = np.argsort([len(text) for text in texts])
+    rows = []
+    for start in range(0, len(order), batch_size):
+        batch = [texts[i] for i in order[start:start + batch_size]]
+        rows.append(np.asarray(
+            model.encode(
+                batch,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            ),
+            dtype=np.float32
+        ))
+    sorted_embeddings = np.vstack(rows)
+
+    # Invert the permutation to match the original text order
+    embeddings = np.empty_like(sorted_embeddings)
+    embeddings[order] = sorted_embeddings
+    return embeddings
+
+
 class _OpenAIEmbeddingWrapper:
     """Wrapper that exposes .encode(texts) for OpenAI embeddings API."""
 
+    # Inputs per embeddings request; small enough that requests can overlap
+    REQUEST_BATCH_SIZE = 256
+    # Cap on concurrent in-flight API requests
+    MAX_CONCURRENT_REQUESTS = 8
+
     def __init__(self, model_id: str, api_key: str):
         self._model_id = model_id
-        self._client = __import__("openai", fromlist=["OpenAI"]).OpenAI(api_key=api_key)
+        self._api_key = api_key
 
     def encode(self, texts: list[str], show_progress_bar: bool = False) -> np.ndarray:
         del show_progress_bar  # no-op for API
         if not texts:
             return np.zeros((0, 1536), dtype=np.float32)  # text-embedding-3-small dim
-        response = self._client.embeddings.create(model=self._model_id, input=texts)
-        # response.data order matches input order
-        embeddings = [d.embedding for d in response.data]
-        return np.array(embeddings, dtype=np.float32)
+
+        # Length-sorted sub-requests fired concurrently; results are
+        # scattered back into input order
+        order = np.argsort([len(text) for text in texts])
+        batches = [
+            order[start:start + self.REQUEST_BATCH_SIZE]
+            for start in range(0, len(order), self.REQUEST_BATCH_SIZE)
+        ]
+        responses = asyncio.run(
+            self._embed_batches([[texts[i] for i in batch] for batch in batches])
+        )
+
+        # Rows are written straight into one preallocated float32 array —
+        # no Python list-of-lists materialization in between
+        embeddings = None
+        for indices, response in zip(batches, responses):
+            # response.data order matches input order
+            for i, d in zip(indices, response.data):
+                row = self._decode_embedding(d.embedding)
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), row.shape[0]), dtype=np.float32)
+                embeddings[i] = row
+        return embeddings
+
+    @staticmethod
+    def _decode_embedding(embedding) -> np.ndarray:
+        """Decode one response embedding into a float32 row."""
+        if isinstance(embedding, str):
+            # base64 transport: raw little-endian float32 bytes
+            return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+        return np.asarray(embedding, dtype=np.float32)
+
+    async def _embed_batches(self, batches: list[list[str]]):
+        """Run embedding requests concurrently, bounded by a semaphore.
+
+        Embeddings are requested in base64: ~25% smaller on the wire and
+        decodable with np.frombuffer instead of per-float JSON parsing.
+
+        The client is built per call: each encode() runs under its own
+        asyncio.run, and a client cached across calls would keep httpx
+        connections bound to the previous (closed) loop — the next encode
+        would raise 'Event loop is closed'. Same pattern as
+        llm.generate_responses.
+        """
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(api_key=self._api_key)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async def embed(batch):
+            async with semaphore:
+                return await client.embeddings.create(
+                    model=self._model_id, input=batch, encoding_format="base64"
+                )
+
+        return await asyncio.gather(*(embed(batch) for batch in batches))
+
+
+class _CachedEncoder:
+    """Content-hash embedding cache wrapped around an encoder.
+
+    Embeddings are persisted on disk keyed by a digest of each chunk's text,
+    so re-running the pipeline over unchanged chunks skips encoding entirely
+    (and avoids repeat API calls for the OpenAI model). The cache is scoped
+    per model, so switching models never mixes embedding spaces.
+    """
+
+    # In-memory corpus results kept per encoder instance
+    BATCH_CACHE_MAX = 8
+
+    def __init__(self, model, model_name: str):
+        self._model = model
+        cache_dir = EMBEDDING_CACHE_DIR / model_name.replace("/", "_").replace(":", "_")
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_path = str(cache_dir / f"embeddings.v{EMBEDDING_CACHE_VERSION}")
+        # Whole-corpus memo: digest of all texts -> result array. The
+        # encoder lives across reruns (st.cache_resource), so re-clicking
+        # Generate Embeddings on unchanged text is a single dict lookup
+        # with no shelve I/O at all.
+        self._batch_cache: dict[str, np.ndarray] = {}
+        # st.cache_resource shares one encoder process-wide and the warm-up
+        # thread can encode concurrently with a user click; shelve (dbm)
+        # allows only one writer, so all cache access is serialized here
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _batch_digest(texts: list[str]) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for text in texts:
+            data = text.encode("utf-8")
+            h.update(len(data).to_bytes(8, "little"))  # length-prefix: no collisions across boundaries
+            h.update(data)
+        return h.hexdigest()
+
+    def encode(self, texts: list[str], show_progress_bar: bool = False) -> np.ndarray:
+        if not texts:
+            return self._model.encode(texts, show_progress_bar=show_progress_bar)
+
+        batch_key = self._batch_digest(texts)
+
+        # One thread at a time: concurrent shelve.open writers raise
+        # (gdbm holds an exclusive lock), and holding the lock across the
+        # encode also collapses duplicate concurrent corpus encodes into
+        # one pass plus a memo hit
+        with self._lock:
+            cached_batch = self._batch_cache.get(batch_key)
+            if cached_batch is not None:
+                return cached_batch
+
+            keys = [self._digest(text) for text in texts]
+
+            with shelve.open(self._cache_path) as db:
+                cached = {key: db[key] for key in set(keys) if key in db}
+
+                # Encode only the texts we haven't seen before
+                missing = [i for i, key in enumerate(keys) if keys[i] not in cached]
+                if missing:
+                    missing_texts = [texts[i] for i in missing]
+                    if isinstance(self._model, _OpenAIEmbeddingWrapper):
+                        # The API wrapper batches server-side requests itself
+                        fresh = self._model.encode(missing_texts)
+                    else:
+                        fresh = _encode_length_sorted(self._model, missing_texts)
+                    for i, row in zip(missing, fresh):
+                        cached[keys[i]] = row
+                        db[keys[i]] = row
+
+                # Scatter cached and fresh rows back into input order
+                dim = next(iter(cached.values())).shape[0]
+                embeddings = np.empty((len(texts), dim), dtype=np.float32)
+                for i, key in enumerate(keys):
+                    embeddings[i] = cached[key]
+
+            if len(self._batch_cache) >= self.BATCH_CACHE_MAX:
+                self._batch_cache.pop(next(iter(self._batch_cache)))
+            self._batch_cache[batch_key] = embeddings
+
+            return embeddings
 
 
 @st.cache_resource
 def load_model(model_name: str):
-    """Load embedding model: SentenceTransformer (local) or OpenAI (cloud)."""
+    """Load embedding model: SentenceTransformer (local) or OpenAI (cloud).
+
+    The returned encoder caches embeddings on disk by content hash, so
+    repeated runs over the same chunks skip encoding.
+    """
     if _is_openai_model(model_name):
         api_key = get_api_key()
         if not api_key:
@@ -43,5 +285,5 @@ def load_model(model_name: str):
                 "OpenAI embedding model selected but OPENAI_API_KEY not set "
                 "(environment or Streamlit secrets)."
             )
-        return _OpenAIEmbeddingWrapper(_openai_model_id(model_name), api_key)
-    return SentenceTransformer(model_name)
+        return _CachedEncoder(_OpenAIEmbeddingWrapper(_openai_model_id(model_name), api_key), model_name)
+    return _CachedEncoder(_load_sentence_transformer(model_name), model_name)
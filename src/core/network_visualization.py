@@ -1,49 +1,155 @@
 """Network graph visualization for semantic relationships between chunks"""
 
+import hashlib
+
 import numpy as np
 import plotly.graph_objects as go
 import networkx as nx
+import streamlit as st
 from typing import List, Optional, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    import faiss  # optional: exact inner-product search with tiled SIMD kernels
+except ImportError:
+    faiss = None
+
+# Most recent FAISS index, keyed by a digest of the normalized embeddings
+# so repeated calls on the same corpus skip the rebuild
+_FAISS_INDEX_CACHE: dict = {}
+
+
+def _get_faiss_index(normalized: np.ndarray):
+    """Build (or reuse) an IndexFlatIP over the normalized embeddings."""
+    key = hashlib.blake2b(normalized.tobytes(), digest_size=16).hexdigest()
+    index = _FAISS_INDEX_CACHE.get(key)
+    if index is None:
+        index = faiss.IndexFlatIP(normalized.shape[1])
+        index.add(normalized)
+        _FAISS_INDEX_CACHE.clear()  # keep only the current corpus
+        _FAISS_INDEX_CACHE[key] = index
+    return index
+
+
+def _normalized_fp32(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize embeddings as float32 (cosine becomes a dot product)"""
+    normalized = np.asarray(embeddings).astype(np.float32, copy=True)
+    norms = np.linalg.norm(normalized, axis=1, keepdims=True)
+    normalized /= np.clip(norms, 1e-12, None)
+    return normalized
+
+
+# Widest neighbor count the precomputed adjacency covers (the UI slider
+# tops out here); slider changes then filter cached arrays instead of
+# redoing the O(N^2) similarity
+_K_MAX = 10
 
 
 def find_semantic_neighbors(
     embeddings: np.ndarray,
     n_neighbors: int = 5,
-    similarity_threshold: float = 0.3
+    similarity_threshold: float = 0.3,
+    assume_normalized: bool = False
 ) -> dict:
     """Find semantic neighbors for each chunk based on embedding similarity
-    
+
+    The O(N^2) similarity work is done once per corpus: a cached helper
+    computes the top-_K_MAX neighbors for every chunk, and this function
+    just slices to n_neighbors and masks by the threshold — so dragging
+    either slider costs O(N x k), not a fresh matmul. n_neighbors above
+    _K_MAX is clamped (the UI never exceeds it).
+
     Args:
         embeddings: Array of chunk embeddings
         n_neighbors: Number of neighbors to find for each chunk
         similarity_threshold: Minimum similarity score to consider as neighbor
-        
+        assume_normalized: Skip re-normalization when the caller passes a
+            matrix with unit-norm float32 rows (e.g. the precomputed
+            session copy)
+
     Returns:
         Dictionary mapping chunk index to list of (neighbor_index, similarity_score) tuples
     """
-    # Compute cosine similarity matrix
-    similarity_matrix = cosine_similarity(embeddings)
-    
-    neighbors_dict = {}
-    
-    for i in range(len(embeddings)):
-        # Get similarities for this chunk (excluding itself)
-        similarities = similarity_matrix[i].copy()
-        similarities[i] = -1  # Exclude self
-        
-        # Get top N neighbors above threshold
-        top_indices = np.argsort(similarities)[::-1][:n_neighbors]
-        
-        neighbors = []
-        for idx in top_indices:
-            score = similarities[idx]
-            if score >= similarity_threshold:
-                neighbors.append((int(idx), float(score)))
-        
-        neighbors_dict[i] = neighbors
-    
-    return neighbors_dict
+    embeddings = np.asarray(embeddings)
+    fingerprint = hashlib.blake2b(embeddings.tobytes(), digest_size=16).hexdigest()
+    top_idx, top_sims = _topk_cached(fingerprint, assume_normalized, embeddings)
+
+    k = min(n_neighbors, top_idx.shape[1])
+    return {
+        i: [
+            (int(j), float(s))
+            for j, s in zip(top_idx[i, :k], top_sims[i, :k])
+            if s >= similarity_threshold
+        ]
+        for i in range(len(top_idx))
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=8, hash_funcs={np.ndarray: lambda _: None})
+def _topk_cached(fingerprint: str, assume_normalized: bool, embeddings: np.ndarray):
+    """Top-_K_MAX neighbor indices and similarities per row, per corpus.
+
+    Returns (indices, similarities) arrays of shape (n, k), each row
+    sorted by descending similarity with self excluded. Cached on the
+    corpus fingerprint only, so neither slider appears in the key. The
+    ndarray is excluded from Streamlit's hashing — the caller's cheap
+    fingerprint already identifies its content.
+    """
+    if assume_normalized:
+        normalized = np.ascontiguousarray(embeddings, dtype=np.float32)
+    else:
+        normalized = _normalized_fp32(embeddings)
+
+    n_chunks = len(normalized)
+    k = min(_K_MAX, n_chunks - 1)
+    if k <= 0:
+        return (np.empty((n_chunks, 0), dtype=np.int64),
+                np.empty((n_chunks, 0), dtype=np.float32))
+
+    # Prefer FAISS when installed: exact inner-product search over the
+    # normalized rows, with the index reused across calls on the same corpus
+    if faiss is not None:
+        index = _get_faiss_index(normalized)
+        # +1 because self ranks first; it's masked out below
+        scores, indices = index.search(normalized, min(k + 1, n_chunks))
+        scores[indices == np.arange(n_chunks)[:, None]] = -np.inf
+    else:
+        # Fallback: cosine similarity as a single fp32 BLAS matmul,
+        # pre-trimmed to the k+1 best columns per row via argpartition
+        similarity_matrix = normalized @ normalized.T
+        np.fill_diagonal(similarity_matrix, -np.inf)  # exclude self
+        kth = min(k, n_chunks - 1)
+        indices = np.argpartition(-similarity_matrix, kth - 1, axis=1)[:, :kth]
+        scores = np.take_along_axis(similarity_matrix, indices, axis=1)
+
+    # Sort just the gathered columns per row, best first, and keep k
+    order = np.argsort(-scores, axis=1)[:, :k]
+    top_idx = np.take_along_axis(indices, order, axis=1).astype(np.int64)
+    top_sims = np.take_along_axis(scores, order, axis=1)
+    return top_idx, top_sims
+
+
+@st.cache_data(show_spinner=False)
+def _compute_layout(edges: tuple, n_nodes: int, layout_algorithm: str) -> dict:
+    """Compute scaled node positions once per (edges, layout) combination
+
+    Spring layout is pure Python and O(iterations x edges); caching means
+    only the first render pays for it — every Streamlit rerun with the
+    same graph and algorithm hits the cache.
+    """
+    G = nx.Graph()
+    G.add_nodes_from(range(n_nodes))
+    G.add_weighted_edges_from(edges)
+
+    if layout_algorithm == "circular":
+        pos = nx.circular_layout(G)
+    elif layout_algorithm == "kamada_kawai":
+        pos = nx.kamada_kawai_layout(G)
+    else:
+        pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
+
+    # Scale positions for better visualization
+    scale = 500
+    return {node: (xy[0] * scale, xy[1] * scale) for node, xy in pos.items()}
 
 
 def create_network_graph(
@@ -67,38 +173,16 @@ def create_network_graph(
     Returns:
         Plotly figure object
     """
-    # Create NetworkX graph
-    G = nx.Graph()
-    
-    # Add nodes
-    for i in range(len(chunks)):
-        G.add_node(i)
-    
-    # Add edges based on semantic neighbors
-    edge_weights = []
+    # Collect unique edges from the semantic neighbors
+    edges = []
     for node, neighbors in neighbors_dict.items():
         for neighbor_idx, similarity in neighbors:
             if node < neighbor_idx:  # Avoid duplicate edges
-                G.add_edge(node, neighbor_idx, weight=similarity)
-                edge_weights.append(similarity)
-    
-    # Choose layout algorithm
-    if layout_algorithm == "spring":
-        pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
-    elif layout_algorithm == "circular":
-        pos = nx.circular_layout(G)
-    elif layout_algorithm == "kamada_kawai":
-        pos = nx.kamada_kawai_layout(G)
-    else:
-        pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
-    
-    # Scale positions for better visualization
-    scale = 500
-    for node in pos:
-        pos[node] = (pos[node][0] * scale, pos[node][1] * scale)
-    
-    # Create edge traces
-    edge_traces = []
+                edges.append((node, neighbor_idx, similarity))
+    edge_weights = [weight for _, _, weight in edges]
+
+    # Layout is memoized per (edges, layout) so reruns skip the solve
+    pos = _compute_layout(tuple(edges), len(chunks), layout_algorithm)
     
     # Normalize edge weights for opacity
     if edge_weights:
@@ -108,27 +192,43 @@ def create_network_graph(
     else:
         min_weight = 0
         weight_range = 1
-    
-    for edge in G.edges(data=True):
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        weight = edge[2].get('weight', 0.5)
-        
-        # Calculate opacity based on similarity
-        opacity = 0.2 + 0.6 * ((weight - min_weight) / weight_range)
-        
-        edge_trace = go.Scatter(
-            x=[x0, x1, None],
-            y=[y0, y1, None],
+
+    # Plotly render cost scales with trace count, so instead of one trace
+    # per edge, bucket edges into a handful of weight bins and draw each
+    # bin as a single trace using None separators between segments
+    n_bins = 5
+    binned_segments = [[] for _ in range(n_bins)]
+    for node, neighbor_idx, weight in edges:
+        relative = (weight - min_weight) / weight_range
+        bin_idx = min(int(relative * n_bins), n_bins - 1)
+        binned_segments[bin_idx].append((pos[node], pos[neighbor_idx]))
+
+    edge_traces = []
+    for bin_idx, segments in enumerate(binned_segments):
+        if not segments:
+            continue
+
+        # Style each bin by its midpoint weight
+        relative = (bin_idx + 0.5) / n_bins
+        opacity = 0.2 + 0.6 * relative
+
+        edge_x = []
+        edge_y = []
+        for (x0, y0), (x1, y1) in segments:
+            edge_x.extend((x0, x1, None))
+            edge_y.extend((y0, y1, None))
+
+        edge_traces.append(go.Scatter(
+            x=edge_x,
+            y=edge_y,
             mode='lines',
             line=dict(
-                width=1 + 2 * ((weight - min_weight) / weight_range),
+                width=1 + 2 * relative,
                 color=f'rgba(150, 150, 150, {opacity})'
             ),
             hoverinfo='none',
             showlegend=False
-        )
-        edge_traces.append(edge_trace)
+        ))
     
     # Prepare node data
     node_x = []
@@ -139,7 +239,7 @@ def create_network_graph(
     node_hover = []
     node_opacities = []
     
-    for node in G.nodes():
+    for node in range(len(chunks)):
         x, y = pos[node]
         node_x.append(x)
         node_y.append(y)
@@ -253,38 +353,45 @@ def create_2d_scatter_with_neighbors(
     """
     fig = go.Figure()
     
-    # Add connection lines for neighbors
-    for node, neighbors in neighbors_dict.items():
-        for neighbor_idx, similarity in neighbors:
-            if node < neighbor_idx:  # Avoid duplicate lines
-                opacity = 0.1 + 0.4 * similarity
-                fig.add_trace(go.Scatter(
-                    x=[embeddings[node, 0], embeddings[neighbor_idx, 0]],
-                    y=[embeddings[node, 1], embeddings[neighbor_idx, 1]],
-                    mode='lines',
-                    line=dict(
-                        width=0.5 + similarity,
-                        color=f'rgba(150, 150, 150, {opacity})'
-                    ),
-                    hoverinfo='skip',
-                    showlegend=False
-                ))
-    
-    # Prepare node data
-    colors = []
-    sizes = []
-    labels = []
-    
-    for i in range(len(chunks)):
-        chunk_preview = chunks[i][:50] + "..." if len(chunks[i]) > 50 else chunks[i]
-        labels.append(chunk_preview)
-        
-        if selected_indices and i in selected_indices:
-            colors.append('#ff6b6b')
-            sizes.append(12)
-        else:
-            colors.append('#667eea')
-            sizes.append(8)
+    # Add all neighbor connections as one trace — coordinates assembled
+    # with NumPy indexing as (E, 3) columns [x0, x1, NaN] and raveled,
+    # the NaN acting as the segment separator
+    pairs = np.array(
+        [(node, neighbor_idx)
+         for node, neighbors in neighbors_dict.items()
+         for neighbor_idx, _ in neighbors
+         if node < neighbor_idx],  # Avoid duplicate lines
+        dtype=np.int64
+    )
+
+    if len(pairs):
+        separators = np.full(len(pairs), np.nan)
+        edge_x = np.column_stack([
+            embeddings[pairs[:, 0], 0], embeddings[pairs[:, 1], 0], separators
+        ]).ravel()
+        edge_y = np.column_stack([
+            embeddings[pairs[:, 0], 1], embeddings[pairs[:, 1], 1], separators
+        ]).ravel()
+        fig.add_trace(go.Scatter(
+            x=edge_x,
+            y=edge_y,
+            mode='lines',
+            line=dict(width=1, color='rgba(150, 150, 150, 0.3)'),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+
+    # Prepare node data (colors/sizes via array assignment, no per-node loop)
+    colors = np.full(len(chunks), '#667eea', dtype=object)
+    sizes = np.full(len(chunks), 8)
+    if selected_indices:
+        colors[list(selected_indices)] = '#ff6b6b'
+        sizes[list(selected_indices)] = 12
+
+    labels = [
+        chunk[:50] + "..." if len(chunk) > 50 else chunk
+        for chunk in chunks
+    ]
     
     # Add chunk points
     fig.add_trace(go.Scatter(
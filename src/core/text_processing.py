@@ -1,59 +1,133 @@
 """Text processing utilities"""
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+try:
+    # Optional drop-in: RE2 matches with a DFA (linear scan, no
+    # backtracking overhead per byte); all patterns below are RE2-safe
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Markdown-cleanup patterns, compiled once at import so each call scans
+# the text without re-compilation, and related rules share a single pass
+_RE_HEADER = _regex.compile(r'^#+\s+', _regex.MULTILINE)
+_RE_HRULE = _regex.compile(r'^[\-=\*]{3,}\s*$', _regex.MULTILINE)
+# Bold/italic variants fused into one alternation (**text**, __text__, *text*, _text_)
+_RE_EMPHASIS = _regex.compile(r'\*\*([^\*]+)\*\*|__([^_]+)__|\*([^\*]+)\*|_([^_]+)_')
+_RE_CODE = _regex.compile(r'`([^`]+)`')
+_RE_LINK = _regex.compile(r'\[([^\]]+)\]\([^\)]+\)')
+_RE_IMAGE = _regex.compile(r'!\[[^\]]*\]\([^\)]+\)')
+_RE_HTML = _regex.compile(r'<[^>]+>')
+# Bullet and numbered list markers fused into one pattern
+_RE_LIST_MARKER = _regex.compile(r'^[\s]*(?:[\-\*•]|\d+\.)\s+', _regex.MULTILINE)
+_RE_BLANK_LINES = _regex.compile(r'\n{3,}')
+# One span covering the newline and the whitespace on both sides: the
+# two-alternative form ([ \t]+\n|\n[ \t]+) consumed the \n with the first
+# branch and left the next line's leading whitespace behind
+_RE_LINE_EDGES = _regex.compile(r'[ \t]*\n[ \t]*')
+_RE_MULTI_SPACE = _regex.compile(r' {2,}')
+# One scan that can rule out every markdown construct above: plain-text
+# uploads (logs, transcripts) skip the symbol-stripping passes entirely
+_RE_MARKDOWN_PROBE = _regex.compile(r'[#*_`\[<\-=•]|\d+\.')
+
+# Inputs above this size are chunked in parallel across paragraph shards
+PARALLEL_CHUNK_THRESHOLD = 200_000
+_SHARD_TARGET_SIZE = 50_000
+
+
+def _keep_first_group(match) -> str:
+    """Replacement for fused alternations: keep whichever group matched"""
+    return next(g for g in match.groups() if g is not None)
+
 
 def clean_markdown_text(text: str) -> str:
     """Clean markdown formatting and symbols from text
-    
+
     Args:
         text: Raw text potentially containing markdown
-        
+
     Returns:
         Cleaned text with markdown removed
     """
+    # Obviously-not-markdown fast path: when no symbol any markdown rule
+    # matches on is present, only the whitespace normalization below can
+    # fire — skip the other eight passes (output is identical either way)
+    if _RE_MARKDOWN_PROBE.search(text) is None:
+        text = _RE_BLANK_LINES.sub('\n\n', text)
+        text = _RE_LINE_EDGES.sub('\n', text)
+        text = _RE_MULTI_SPACE.sub(' ', text)
+        return text.strip()
+
     # Remove markdown headers (# ## ### etc.)
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    
+    text = _RE_HEADER.sub('', text)
+
     # Remove horizontal rules (--- === ***)
-    text = re.sub(r'^[\-=\*]{3,}\s*$', '', text, flags=re.MULTILINE)
-    
-    # Remove bold/italic markers (**text** or *text* or __text__ or _text_)
-    text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'\*([^\*]+)\*', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    
+    text = _RE_HRULE.sub('', text)
+
+    # Remove bold/italic markers; repeat until stable so nested markers
+    # (e.g. **bold with _italic_**) unwrap the same way the old
+    # one-pattern-at-a-time passes did
+    while True:
+        stripped = _RE_EMPHASIS.sub(_keep_first_group, text)
+        if stripped == text:
+            break
+        text = stripped
+
     # Remove inline code markers (`code`)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
+    text = _RE_CODE.sub(r'\1', text)
+
     # Remove links [text](url) -> text
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    
+    text = _RE_LINK.sub(r'\1', text)
+
     # Remove image references ![alt](url)
-    text = re.sub(r'!\[[^\]]*\]\([^\)]+\)', '', text)
-    
+    text = _RE_IMAGE.sub('', text)
+
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
+    text = _RE_HTML.sub('', text)
+
     # Remove bullet points and list markers (-, *, •, 1., 2., etc.)
-    text = re.sub(r'^[\s]*[\-\*•]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^[\s]*\d+\.\s+', '', text, flags=re.MULTILINE)
-    
+    text = _RE_LIST_MARKER.sub('', text)
+
     # Remove multiple consecutive blank lines (keep max 2 for paragraph separation)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
+    text = _RE_BLANK_LINES.sub('\n\n', text)
+
     # Remove leading/trailing whitespace from each line
-    text = '\n'.join(line.strip() for line in text.split('\n'))
-    
+    text = _RE_LINE_EDGES.sub('\n', text)
+
     # Remove multiple spaces
-    text = re.sub(r' {2,}', ' ', text)
-    
+    text = _RE_MULTI_SPACE.sub(' ', text)
+
     return text.strip()
 
 
+def _shard_text(text: str, overlap_chars: int) -> List[str]:
+    """Split text into ~50k-char shards at paragraph boundaries
+
+    Each shard after the first is prefixed with the tail of the previous
+    one so the splitter can approximate cross-shard overlap.
+    """
+    shards = []
+    start = 0
+    while start < len(text):
+        end = start + _SHARD_TARGET_SIZE
+        if end < len(text):
+            # Cut at the nearest paragraph break; fall back to a hard cut
+            boundary = text.rfind('\n\n', start, end)
+            if boundary > start:
+                end = boundary
+        shard = text[start:end]
+        if shards and overlap_chars:
+            shard = text[max(0, start - overlap_chars):start] + shard
+        shards.append(shard)
+        start = end
+    return shards
+
+
 def chunk_text(text: str, chunk_size: int = 100, overlap: int = 20, clean_markdown: bool = True) -> List[str]:
     """Split text into overlapping chunks using RecursiveCharacterTextSplitter
     
@@ -82,10 +156,19 @@ def chunk_text(text: str, chunk_size: int = 100, overlap: int = 20, clean_markdo
         is_separator_regex=False,
     )
     
-    chunks = splitter.split_text(text)
-    
+    if len(text) > PARALLEL_CHUNK_THRESHOLD:
+        # Multi-MB inputs: shard at paragraph boundaries and split shards
+        # in a thread pool so chunking doesn't block the app on one core
+        # (the splitter's regex work happens largely in C, outside the GIL)
+        shards = _shard_text(text, char_overlap)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(splitter.split_text, shards))
+        chunks = [chunk for result in results for chunk in result]
+    else:
+        chunks = splitter.split_text(text)
+
     # Final cleanup: remove any empty or whitespace-only chunks
     chunks = [chunk.strip() for chunk in chunks if chunk.strip()]
-    
+
     return chunks
 
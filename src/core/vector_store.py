@@ -1,32 +1,131 @@
 """ChromaDB vector store operations"""
 
-import chromadb
+import os
 import tempfile
 
+import chromadb
+import numpy as np
+
+try:
+    # Optional exact-search backend with SIMD (AVX2/AVX-512) dot-product
+    # kernels; used as an alternative to Chroma's HNSW when installed
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    # Optional JIT kernel: compiled dot-product loop parallelized across
+    # cores; without numba the numpy matmul below is already BLAS-backed
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(E, q):
+        n = E.shape[0]
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = 0.0
+            for d in range(E.shape[1]):
+                s += E[i, d] * q[d]
+            scores[i] = s
+        return scores
+except ImportError:
+    _dot_scores = None
+
+# Below this many chunks a brute-force dot product beats the HNSW
+# query's Python round-trip, so callers can skip ChromaDB entirely
+SMALL_CORPUS_MAX = 5000
+
+
+def topk_cosine(embeddings: np.ndarray, query_embedding: np.ndarray, k: int):
+    """Exact top-k cosine search over normalized embeddings
+
+    Fast path for small corpora: one dot product plus an argpartition,
+    with no index build or client round-trip. Embeddings and the query
+    must already be L2-normalized (they are — encode() normalizes).
+
+    Args:
+        embeddings: (n, d) normalized corpus embeddings
+        query_embedding: (d,) normalized query embedding
+        k: Number of results to return
+
+    Returns:
+        Tuple of (indices, similarities), both length k, best first
+    """
+    E = np.ascontiguousarray(embeddings, dtype=np.float32)
+    q = np.ascontiguousarray(query_embedding, dtype=np.float32)
+    if _dot_scores is not None:
+        scores = _dot_scores(E, q)
+    else:
+        scores = E @ q
+    k = min(k, scores.shape[0])
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx])]
+    return idx, scores[idx]
+
 
-def create_chromadb_collection(collection_name: str = "rag_embeddings"):
+def create_faiss_index(embeddings: np.ndarray):
+    """Build a FAISS inner-product index over the corpus embeddings
+
+    Exact search (IndexFlatIP) with FAISS's vectorized kernels — far less
+    per-query overhead than Chroma's wrapper for one-query-at-a-time use.
+    Vectors are copied and re-normalized so inner product equals cosine
+    similarity regardless of the embedding source. Corpora past the
+    brute-force threshold use 8-bit scalar quantization instead: 4x less
+    index memory and bandwidth for negligible cosine drift.
+
+    Args:
+        embeddings: (n, d) corpus embeddings
+
+    Returns:
+        FAISS index ready to search, or None when faiss is not installed
+    """
+    if faiss is None:
+        return None
+    vectors = np.array(embeddings, dtype=np.float32, order='C', copy=True)
+    faiss.normalize_L2(vectors)
+    if vectors.shape[0] >= SMALL_CORPUS_MAX:
+        index = faiss.IndexScalarQuantizer(
+            vectors.shape[1], faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+    else:
+        index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def create_chromadb_collection(collection_name: str = "rag_embeddings", content_key: str = None):
     """Create or get ChromaDB collection
-    
+
+    Uses a PersistentClient so the HNSW index survives Streamlit reruns
+    (and sessions) instead of being rebuilt from scratch on every click.
+    The storage directory can be overridden with the CHROMA_DIR
+    environment variable.
+
     Args:
-        collection_name: Name of the collection to create
-        
+        collection_name: Base name of the collection
+        content_key: Optional digest of the ingested content; appended to
+            the name so identical text maps back to its already-built
+            collection and changed text gets a fresh one
+
     Returns:
-        ChromaDB collection instance
+        ChromaDB collection instance (callers should check .count() to
+        decide whether the content still needs to be added)
     """
-    # Use the new EphemeralClient for in-memory storage
-    # or PersistentClient for disk storage
-    client = chromadb.EphemeralClient()
-    
-    # Delete existing collection if it exists
-    try:
-        client.delete_collection(collection_name)
-    except:
-        pass
-    
-    collection = client.create_collection(
+    if content_key:
+        collection_name = f"{collection_name}_{content_key}"
+
+    persist_dir = os.environ.get("CHROMA_DIR", os.path.join(tempfile.gettempdir(), "chroma"))
+    client = chromadb.PersistentClient(path=persist_dir)
+
+    collection = client.get_or_create_collection(
         name=collection_name,
-        metadata={"hnsw:space": "cosine"}
+        metadata={
+            "hnsw:space": "cosine",
+            "hnsw:M": 16,
+            "hnsw:construction_ef": 100,
+            "hnsw:search_ef": 64,
+        }
     )
-    
-    return collection
 
+    return collection
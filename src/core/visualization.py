@@ -1,38 +1,82 @@
 """Visualization and dimensionality reduction utilities"""
 
+import hashlib
+
 import numpy as np
 import plotly.graph_objects as go
+import streamlit as st
 from sklearn.decomposition import PCA
-import umap
 from typing import List, Optional
 
+try:
+    # Optional GPU backend: neighbor search + layout SGD run on CUDA,
+    # which dominates UMAP time for corpora beyond a few hundred chunks
+    from cuml.manifold import UMAP as _UMAP
+except ImportError:
+    import umap
+    _UMAP = umap.UMAP
+
+# Above this many chunks the 3D plot downsamples and drops text labels
+MAX_RENDER_POINTS = 2000
+
 
 def reduce_dimensions(embeddings: np.ndarray, method: str = "pca", n_components: int = 3):
     """Reduce embedding dimensions for visualization
-    
+
+    Results are memoized on a fingerprint of the embedding bytes, so the
+    (potentially multi-second) PCA/UMAP fit only runs when the embeddings
+    or parameters actually change — not on every Streamlit rerun.
+
     Args:
         embeddings: High-dimensional embeddings
-        method: Reduction method ('pca' or 'umap')
+        method: Reduction method ('pca', 'umap' or 'pacmap')
         n_components: Number of dimensions to reduce to
-        
+
     Returns:
         Reduced embeddings array
     """
+    embeddings = np.asarray(embeddings)
+    fingerprint = hashlib.blake2b(embeddings.tobytes(), digest_size=16).hexdigest()
+    return _reduce_cached(fingerprint, embeddings.shape, method, n_components, embeddings)
+
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60, max_entries=32, hash_funcs={np.ndarray: lambda _: None})
+def _reduce_cached(fingerprint: str, shape: tuple, method: str, n_components: int, embeddings: np.ndarray):
+    """Run the actual reduction; cached by (fingerprint, shape, params).
+
+    The ndarray itself is excluded from Streamlit's hashing (the cheap
+    fingerprint computed by the caller already identifies its content).
+    """
     # Adjust n_components if we have fewer samples
     n_samples = embeddings.shape[0]
     actual_components = min(n_components, n_samples)
     
     if method == "pca":
-        reducer = PCA(n_components=actual_components)
+        # Randomized solver: we only ever need 2-3 components out of a
+        # 384/1536-d space, so a full LAPACK SVD is wasted work
+        reducer = PCA(
+            n_components=actual_components,
+            svd_solver='randomized',
+            n_oversamples=10,
+            random_state=42
+        )
     elif method == "umap":
         # UMAP needs at least 2 samples
         if n_samples < 2:
             # If only 1 sample, pad with zeros for visualization
             reduced = np.zeros((n_samples, n_components))
             return reduced
-        reducer = umap.UMAP(n_components=actual_components, random_state=42)
+        reducer = _UMAP(
+            n_components=actual_components,
+            n_neighbors=min(15, n_samples - 1),
+            random_state=42
+        )
+    elif method == "pacmap":
+        # Optional CPU alternative, ~5x faster than umap-learn for mid-sized N
+        import pacmap
+        reducer = pacmap.PaCMAP(n_components=actual_components, n_neighbors=min(10, n_samples - 1))
     else:
-        raise ValueError("Method must be 'pca' or 'umap'")
+        raise ValueError("Method must be 'pca', 'umap' or 'pacmap'")
     
     reduced = reducer.fit_transform(embeddings)
     
@@ -67,39 +111,57 @@ def create_3d_plot(
         reduced_embeddings = np.hstack([reduced_embeddings, padding])
     
     # Truncate chunk labels for display
-    labels = [chunk[:50] + "..." if len(chunk) > 50 else chunk for chunk in chunks]
-    
-    # Create colors based on selection
-    colors = ['#667eea'] * len(chunks)
-    sizes = [8] * len(chunks)
-    
+    labels = np.array(
+        [chunk[:50] + "..." if len(chunk) > 50 else chunk for chunk in chunks],
+        dtype=object
+    )
+    point_text = np.array([f"Chunk {i}" for i in range(len(chunks))], dtype=object)
+
+    # Colors/sizes via array assignment instead of a per-index Python loop
+    colors = np.full(len(chunks), '#667eea', dtype=object)
+    sizes = np.full(len(chunks), 8)
+
     if selected_indices:
-        for idx in selected_indices:
-            colors[idx] = '#ff6b6b'
-            sizes[idx] = 12
-    
+        selected = np.asarray(selected_indices)
+        colors[selected] = '#ff6b6b'
+        sizes[selected] = 12
+
+    # Level of detail: past a couple thousand points, per-point text labels
+    # tank the browser framerate and the JSON payload balloons. Downsample
+    # the regular points (always keeping the retrieved ones) and drop the
+    # text layer; hover info stays intact.
+    n_points = len(chunks)
+    keep = slice(None)
+    mode = 'markers+text'
+    if n_points > MAX_RENDER_POINTS:
+        rng = np.random.default_rng(0)
+        keep = rng.choice(n_points, MAX_RENDER_POINTS, replace=False)
+        if selected_indices:
+            keep = np.union1d(keep, np.asarray(selected_indices))
+        mode = 'markers'
+
     # Main scatter plot
     fig = go.Figure()
-    
+
     # Add chunk points
     fig.add_trace(go.Scatter3d(
-        x=reduced_embeddings[:, 0],
-        y=reduced_embeddings[:, 1],
-        z=reduced_embeddings[:, 2],
-        mode='markers+text',
+        x=reduced_embeddings[keep, 0],
+        y=reduced_embeddings[keep, 1],
+        z=reduced_embeddings[keep, 2],
+        mode=mode,
         marker=dict(
-            size=sizes,
-            color=colors,
+            size=sizes[keep],
+            color=colors[keep],
             opacity=0.8,
             line=dict(color='white', width=0.5)
         ),
-        text=[f"Chunk {i}" for i in range(len(chunks))],
+        text=point_text[keep],
         hovertemplate='<b>Chunk %{text}</b><br>' +
                       'X: %{x:.3f}<br>' +
                       'Y: %{y:.3f}<br>' +
                       'Z: %{z:.3f}<br>' +
                       '<extra></extra>',
-        customdata=labels,
+        customdata=labels[keep],
         name='Chunks'
     ))
     
@@ -136,7 +198,8 @@ def create_3d_plot(
         font=dict(color="white"),
         height=700,
         showlegend=True,
-        hovermode='closest'
+        hovermode='closest',
+        uirevision='static'  # keep camera/zoom across Streamlit reruns
     )
     
     return fig
@@ -0,0 +1,37 @@
+"""Background embedding-model warm-up
+
+Lives in its own dependency-free module: importing warm_model at app
+startup must not pull in src.core.models (torch, sentence_transformers,
+openai) on the main thread — the multi-second import cost belongs in the
+background thread along with the weight load itself.
+"""
+
+import threading
+
+_warmup_started = False
+
+
+def warm_model(model_name: str) -> None:
+    """Load and warm the embedding model in a background thread.
+
+    Called once at app startup so the heavy imports, the weight load and
+    the first forward pass (lazy kernel/graph initialization) happen while
+    the user is still reading the page, not when they click Generate
+    Embeddings. Subsequent calls are no-ops; failures just fall back to
+    lazy loading on first use.
+    """
+    global _warmup_started
+    if _warmup_started:
+        return
+    _warmup_started = True
+
+    def _warm():
+        try:
+            # Resolved inside the thread: this is where torch and friends
+            # actually get imported, keeping main-thread cold start lazy
+            from src.core.models import load_model
+            load_model(model_name).encode(["warmup"])
+        except Exception:
+            pass
+
+    threading.Thread(target=_warm, daemon=True).start()
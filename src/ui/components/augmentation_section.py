@@ -1,7 +1,62 @@
 """Augmentation section component - shows prompt construction"""
 
+import re
+from functools import lru_cache
+
 import streamlit as st
-from src.config import DEFAULT_SYSTEM_PROMPT
+from src.config import DEFAULT_MODEL, DEFAULT_SYSTEM_PROMPT
+
+try:
+    import tiktoken  # optional: exact token counts instead of a heuristic
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        return tiktoken.encoding_for_model(DEFAULT_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _build_augmented_message(query: str, docs: tuple) -> str:
+    """Build the augmented user message from the query and retrieved docs
+
+    Cached so edits elsewhere on the page (e.g. typing in the system-prompt
+    box) don't re-concatenate the whole context block every rerun. Built as
+    a flat list of parts joined once rather than nested f-strings, so the
+    context text is materialized a single time.
+    """
+    separator = '=' * 80
+    parts = ["Context Information:\n", separator, "\n"]
+    for i, doc in enumerate(docs):
+        if i:
+            parts.append("\n\n")
+        parts.append(f"[Context {i+1}]:\n{doc}")
+    parts += [
+        "\n", separator,
+        f"\n\nUser Question: {query}\n\n"
+        "Please answer the question based on the context provided above."
+    ]
+    return ''.join(parts)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _estimate_prompt_tokens(user_message: str, system_prompt: str) -> int:
+    """Estimate prompt tokens without re-splitting huge strings per rerun
+
+    Uses tiktoken (Rust tokenizer, exact count) when installed; otherwise
+    counts whitespace tokens with a streaming scan — no word list is
+    materialized — and applies the usual 1.3 words-to-tokens factor.
+    """
+    if tiktoken is not None:
+        encoding = _get_encoding()
+        return len(encoding.encode(user_message)) + len(encoding.encode(system_prompt))
+    words = sum(1 for _ in re.finditer(r'\S+', user_message))
+    words += sum(1 for _ in re.finditer(r'\S+', system_prompt))
+    return int(words * 1.3)
 
 
 def render_augmentation_section():
@@ -73,20 +128,8 @@ def render_augmentation_section():
     # Construct the augmented message
     query_text = st.session_state.get('last_query', '')
     retrieved_docs = st.session_state.query_results['documents'][0]
-    
-    context_text = "\n\n".join([
-        f"[Context {i+1}]:\n{doc}" 
-        for i, doc in enumerate(retrieved_docs)
-    ])
-    
-    augmented_message = f"""Context Information:
-{'='*80}
-{context_text}
-{'='*80}
-
-User Question: {query_text}
 
-Please answer the question based on the context provided above."""
+    augmented_message = _build_augmented_message(query_text, tuple(retrieved_docs))
     
     # Store for generation
     st.session_state.augmented_prompt = {
@@ -100,9 +143,9 @@ Please answer the question based on the context provided above."""
     with st.expander("View Full Augmented Prompt", expanded=False):
         st.code(augmented_message, language="text")
     
-    # Show token estimate
-    estimated_tokens = len(augmented_message.split()) + len(st.session_state.custom_system_prompt.split())
-    st.caption(f"📊 Estimated tokens: ~{estimated_tokens * 1.3:.0f} (prompt)")
+    # Show token estimate (cached per prompt pair)
+    estimated_tokens = _estimate_prompt_tokens(augmented_message, st.session_state.custom_system_prompt)
+    st.caption(f"📊 Estimated tokens: ~{estimated_tokens} (prompt)")
     
     st.divider()
     
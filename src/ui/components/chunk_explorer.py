@@ -29,7 +29,8 @@ def render_chunk_explorer():
     with col2:
         st.write("**Embedding Vector (first 10 dims):**")
         st.caption(f"Preview of {st.session_state.embeddings.shape[1]}D vector")
-        embedding_preview = st.session_state.embeddings[chunk_idx][:10]
-        for i, val in enumerate(embedding_preview):
-            st.text(f"[{i}]: {val:.4f}")
+        # One element for all 10 values: each st.text is its own protocol
+        # message, so the loop cost 10 round-trips per rerender
+        preview_values = st.session_state.embeddings[chunk_idx, :10].tolist()
+        st.code('\n'.join(f"[{i}]: {val:.4f}" for i, val in enumerate(preview_values)), language=None)
 
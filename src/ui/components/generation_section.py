@@ -2,7 +2,7 @@
 
 import streamlit as st
 from src.config import DEFAULT_MODEL
-from src.core.llm import generate_response, validate_api_key
+from src.core.llm import generate_response_stream, validate_api_key
 
 
 def render_generation_section():
@@ -56,30 +56,39 @@ def render_generation_section():
             return
         
         st.session_state.generating = True
-        
-        with st.spinner(f"🧠 Generating response from {DEFAULT_MODEL}..."):
-            try:
-                # Get retrieved documents
-                retrieved_docs = st.session_state.query_results['documents'][0]
-                query = st.session_state.augmented_prompt['query']
-                system_prompt = st.session_state.augmented_prompt['system_prompt']
-                
-                # Generate response (uses DEFAULT_MODEL / DEFAULT_TEMPERATURE from config when not overridden)
-                result = generate_response(
-                    query=query,
-                    retrieved_chunks=retrieved_docs,
-                    system_prompt=system_prompt,
-                    model=DEFAULT_MODEL
-                )
-                
-                st.session_state.llm_response = result
-                st.session_state.generating = False
-                st.success("✅ Response generated successfully!")
-                
-            except Exception as e:
-                st.error(f"❌ Error generating response: {str(e)}")
-                st.session_state.generating = False
-                return
+
+        # Stream tokens as they arrive so the user sees output at
+        # time-to-first-token instead of waiting for the full response
+        st.divider()
+        st.subheader("💡 LLM Response")
+        try:
+            # Get retrieved documents
+            retrieved_docs = st.session_state.query_results['documents'][0]
+            query = st.session_state.augmented_prompt['query']
+            system_prompt = st.session_state.augmented_prompt['system_prompt']
+
+            # result is filled with the response/usage dict once the stream ends
+            result = {}
+            st.write_stream(generate_response_stream(
+                query=query,
+                retrieved_chunks=retrieved_docs,
+                system_prompt=system_prompt,
+                model=DEFAULT_MODEL,
+                result=result
+            ))
+
+        except Exception as e:
+            st.error(f"❌ Error generating response: {str(e)}")
+            st.session_state.generating = False
+            return
+
+        st.session_state.llm_response = result
+        st.session_state.generating = False
+        # Rerun so the stored response renders through the normal display
+        # path below (with metadata) instead of twice. Outside the try:
+        # st.rerun() works by raising, and the handler above would swallow
+        # it and report the control-flow exception as an API error
+        st.rerun()
     
     # Display response if available
     if st.session_state.get('llm_response'):
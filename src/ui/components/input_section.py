@@ -1,9 +1,12 @@
 """Input section component"""
 
+import hashlib
+
+import numpy as np
 import streamlit as st
 from src.core.models import load_model
 from src.core.text_processing import chunk_text
-from src.core.vector_store import create_chromadb_collection
+from src.core.vector_store import create_chromadb_collection, create_faiss_index
 
 
 def render_input_section(model_name: str, chunk_size: int, overlap: int, collection_name: str):
@@ -48,18 +51,37 @@ def render_input_section(model_name: str, chunk_size: int, overlap: int, collect
                 # Generate embeddings
                 embeddings = model.encode(chunks, show_progress_bar=False)
                 st.session_state.embeddings = embeddings
+
+                # Companion unit-norm float32 matrix, computed once here so
+                # the similarity paths do a plain SGEMM with no per-rerun
+                # normalization (encode() output is already unit-norm, but
+                # this guards against drift and guarantees dtype/layout)
+                normalized = np.ascontiguousarray(embeddings, dtype=np.float32)
+                norms = np.linalg.norm(normalized, axis=1, keepdims=True).clip(min=1e-12)
+                st.session_state.embeddings_normalized = normalized / norms
                 
-                # Create ChromaDB collection
-                collection = create_chromadb_collection(collection_name)
-                
-                # Add to ChromaDB
-                collection.add(
-                    embeddings=embeddings.tolist(),
-                    documents=chunks,
-                    ids=[f"chunk_{i}" for i in range(len(chunks))]
-                )
+                # Create ChromaDB collection, keyed by content so an
+                # unchanged corpus maps back to its persisted index
+                content_key = hashlib.blake2b(
+                    f"{model_name}|{chunk_size}|{overlap}|{text_input}".encode("utf-8"),
+                    digest_size=8
+                ).hexdigest()
+                collection = create_chromadb_collection(collection_name, content_key=content_key)
+
+                # Add to ChromaDB (skipped when the persisted index already
+                # holds this exact content) — pass the ndarray directly;
+                # .tolist() would materialize N x D boxed Python floats
+                if collection.count() == 0:
+                    collection.add(
+                        embeddings=np.ascontiguousarray(embeddings, dtype=np.float32),
+                        documents=chunks,
+                        ids=[f"chunk_{i}" for i in range(len(chunks))]
+                    )
                 
                 st.session_state.collection = collection
+                # Optional FAISS index alongside the collection; None when
+                # faiss isn't installed and the query falls back to Chroma
+                st.session_state.faiss_index = create_faiss_index(embeddings)
                 st.session_state.embeddings_generated = True
                 
             st.success(f"✅ Generated embeddings for {len(chunks)} chunks!")
@@ -1,7 +1,9 @@
 """Query section component"""
 
+import numpy as np
 import streamlit as st
 from src.core.models import load_model
+from src.core.vector_store import SMALL_CORPUS_MAX, topk_cosine
 
 
 def render_query_section(model_name: str):
@@ -30,12 +32,62 @@ def render_query_section(model_name: str):
             with st.spinner("Searching..."):
                 model = load_model(model_name)
                 query_embedding = model.encode([query_text])[0]
-                
-                # Query ChromaDB
-                results = st.session_state.collection.query(
-                    query_embeddings=[query_embedding.tolist()],
-                    n_results=n_results
-                )
+
+                chunks = st.session_state.chunks
+                faiss_index = st.session_state.get('faiss_index')
+                if faiss_index is not None:
+                    # Preferred backend: FAISS exact search with SIMD
+                    # kernels, shaped like a Chroma response downstream.
+                    # Clamp k to the corpus size (as topk_cosine does) —
+                    # FAISS pads short results with index -1 / -FLT_MAX
+                    query_vector = np.ascontiguousarray(
+                        query_embedding.reshape(1, -1), dtype=np.float32
+                    )
+                    similarities, indices = faiss_index.search(
+                        query_vector, min(n_results, len(chunks))
+                    )
+                    results = {
+                        'documents': [[chunks[i] for i in indices[0]]],
+                        'distances': [[float(1.0 - s) for s in similarities[0]]],
+                        'ids': [[f"chunk_{i}" for i in indices[0]]],
+                    }
+                elif len(chunks) < SMALL_CORPUS_MAX:
+                    # Small corpus: exact brute-force scoring beats the
+                    # HNSW query round-trip, so skip ChromaDB entirely
+                    indices, similarities = topk_cosine(
+                        st.session_state.embeddings, query_embedding, n_results
+                    )
+                    results = {
+                        'documents': [[chunks[i] for i in indices]],
+                        'distances': [[float(1.0 - s) for s in similarities]],
+                        'ids': [[f"chunk_{i}" for i in indices]],
+                    }
+                else:
+                    # Tune HNSW exploration to the requested result count,
+                    # re-applied only when the value actually changes.
+                    # modify() replaces metadata wholesale, so the new
+                    # search_ef is merged into the existing dict — and some
+                    # chromadb releases reject changing hnsw:* keys after
+                    # creation, in which case the default search_ef is a
+                    # fine fallback and we stop retrying
+                    search_ef = max(64, n_results * 16)
+                    if (st.session_state.get('hnsw_search_ef') != search_ef
+                            and not st.session_state.get('hnsw_search_ef_unsupported')):
+                        try:
+                            metadata = dict(st.session_state.collection.metadata or {})
+                            metadata["hnsw:search_ef"] = search_ef
+                            st.session_state.collection.modify(metadata=metadata)
+                            st.session_state.hnsw_search_ef = search_ef
+                        except Exception:
+                            st.session_state.hnsw_search_ef_unsupported = True
+
+                    # Query ChromaDB with the ndarray directly and only the
+                    # fields we render (ids always come back)
+                    results = st.session_state.collection.query(
+                        query_embeddings=query_embedding.reshape(1, -1),
+                        n_results=n_results,
+                        include=['documents', 'distances']
+                    )
                 
                 st.session_state.query_results = results
                 st.session_state.query_embedding = query_embedding
@@ -23,29 +23,35 @@ def render_sidebar():
         
         model_name = MODEL_OPTIONS[selected_model]
         
-        # Reset embeddings if model changed
-        if st.session_state.current_model is not None and st.session_state.current_model != model_name:
-            reset_embeddings_state()
+        # Reset embeddings if model changed. The selectbox change is
+        # itself a rerun and we reset before anything downstream renders,
+        # so no extra st.rerun() round-trip is needed
+        if st.session_state.current_model != model_name:
+            if st.session_state.current_model is not None:
+                reset_embeddings_state()
             st.session_state.current_model = model_name
-            st.rerun()
-        
-        st.session_state.current_model = model_name
-        
-        # Chunking parameters
-        st.subheader("📝 Chunking Settings")
-        chunk_size = st.slider("Chunk Size (words)", 50, 500, 100, 50)
-        overlap = st.slider("Overlap (words)", 0, 100, 20, 10)
-        
-        # Dimensionality reduction
-        st.subheader("📊 Visualization")
-        reduction_method = st.selectbox(
-            "Reduction Method",
-            ["PCA", "UMAP"],
-            help="Method to reduce embeddings to 3D"
-        )
         
-        # Collection name
-        collection_name = st.text_input("ChromaDB Collection", "rag_embeddings")
+        # Related parameters share one form so dragging several sliders
+        # coalesces into a single rerun when Apply is clicked, instead of
+        # each widget change re-executing the whole pipeline downstream
+        with st.form("config_form", border=False):
+            # Chunking parameters
+            st.subheader("📝 Chunking Settings")
+            chunk_size = st.slider("Chunk Size (words)", 50, 500, 100, 50)
+            overlap = st.slider("Overlap (words)", 0, 100, 20, 10)
+
+            # Dimensionality reduction
+            st.subheader("📊 Visualization")
+            reduction_method = st.selectbox(
+                "Reduction Method",
+                ["PCA", "UMAP"],
+                help="Method to reduce embeddings to 3D"
+            )
+
+            # Collection name
+            collection_name = st.text_input("ChromaDB Collection", "rag_embeddings")
+
+            st.form_submit_button("Apply", use_container_width=True)
         
         st.divider()
         
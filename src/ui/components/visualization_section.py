@@ -1,36 +1,206 @@
 """Visualization section component"""
 
+import hashlib
+
 import streamlit as st
 import numpy as np
-from src.core.visualization import reduce_dimensions, create_3d_plot
-from src.core.network_visualization import (
-    find_semantic_neighbors,
-    create_network_graph,
-    create_2d_scatter_with_neighbors
+
+# Static explanatory blocks, built once at import and pushed through
+# st.html — unlike st.markdown they skip the markdown parse on every rerun
+_VIZ_INTRO_HTML = """
+<div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px; margin-bottom: 20px;'>
+    <h4 style='margin-top: 0; color: #667eea;'>📊 Understanding Visualization Modes</h4>
+    <ul style='margin-bottom: 0;'>
+        <li><b>3D Scatter Plot</b>: Shows chunks as points in 3D space. Best for seeing overall distribution and spatial relationships.</li>
+        <li><b>2D Network Graph</b>: Displays chunks as connected nodes. Best for discovering semantic clusters and relationships.</li>
+        <li><b>2D Scatter with Connections</b>: Combines spatial layout with similarity connections. Best for understanding both position and relationships.</li>
+    </ul>
+</div>
+"""
+
+_READ_NETWORK_HTML = """
+<div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
+    <h4 style='margin-top: 0; color: #667eea;'>🕸️ How to Read the Network Graph</h4>
+    <ul style='margin-bottom: 0;'>
+        <li><b>Nodes (circles)</b>: Each represents a text chunk</li>
+        <li><b>Lines (edges)</b>: Connect semantically similar chunks</li>
+        <li><b>Line thickness</b>: Thicker = higher similarity</li>
+        <li><b>Node clusters</b>: Groups of related content</li>
+        <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query</li>
+        <li><b>Hover</b>: See chunk content and its similar neighbors</li>
+    </ul>
+</div>
+"""
+
+_READ_2D_HTML = """
+<div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
+    <h4 style='margin-top: 0; color: #667eea;'>📍 How to Read the 2D Scatter Plot</h4>
+    <ul style='margin-bottom: 0;'>
+        <li><b>Position</b>: Shows embedding space after dimensionality reduction</li>
+        <li><b>Proximity</b>: Closer points = more semantically similar</li>
+        <li><b>Lines</b>: Connect chunks above similarity threshold</li>
+        <li><b>Line opacity</b>: More opaque = higher similarity</li>
+        <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query</li>
+        <li><b>Axes</b>: Principal components from PCA/UMAP reduction</li>
+    </ul>
+</div>
+"""
+
+_READ_3D_HTML = """
+<div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
+    <h4 style='margin-top: 0; color: #667eea;'>🎯 How to Read the 3D Scatter Plot</h4>
+    <ul style='margin-bottom: 0;'>
+        <li><b>Each point</b>: Represents one text chunk in 3D space</li>
+        <li><b>Position</b>: Determined by embedding similarity (closer = more similar)</li>
+        <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query point</li>
+        <li><b>Interaction</b>: Rotate, zoom, and hover to explore</li>
+        <li><b>Axes</b>: Three principal components from dimensionality reduction</li>
+        <li><b>Clusters</b>: Groups of points indicate related content</li>
+    </ul>
+</div>
+"""
+
+
+# Self-contained snippet that mounts the figure with plotly.js from CDN;
+# __FIG_JSON__ is substituted with the serialized figure
+_PLOT_HTML_TEMPLATE = """
+<div id="viz_plot" style="height:700px;"></div>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<script>
+  var fig = __FIG_JSON__;
+  Plotly.newPlot('viz_plot', fig.data, fig.layout, {responsive: true});
+</script>
+"""
+
+# Each memoized figure is a multi-hundred-KB HTML string living in
+# session state; bound the per-session footprint
+_VIZ_HTML_CACHE_MAX = 16
+
+
+@st.cache_data(
+    show_spinner=False,
+    max_entries=16,
+    hash_funcs={np.ndarray: lambda _: None, list: lambda _: None}
 )
-from src.core.models import load_model
+def _cached_figure_html(
+    fingerprint: str,
+    viz_mode: str,
+    reduction_method: str,
+    n_neighbors: int,
+    similarity_threshold: float,
+    layout_algo: str,
+    selected: tuple,
+    show_query: bool,
+    embeddings: np.ndarray,
+    combined: np.ndarray,
+    chunks: list
+) -> str:
+    """Build the figure for the current view and serialize it to HTML
+
+    Figure construction allocates every trace and a large JSON payload,
+    so the whole build — including the to_json serialization — is cached
+    on the view parameters plus a fingerprint of the combined embeddings
+    (which also identifies the chunks they came from); the arrays and
+    chunk list are excluded from Streamlit's own hashing. Repeat views
+    re-send prebuilt HTML with zero Python-side figure work. Inner calls
+    (reduction, neighbors) have their own caches.
+
+    `embeddings` is the precomputed unit-norm float32 matrix, so the
+    neighbor searches below run straight into the SGEMM/FAISS path
+    without re-normalizing.
+    """
+    # Imported here, not at module top: plotly/networkx/umap (and their
+    # transitive weight) only load once a figure is actually built, so
+    # reruns that never reach the visualization skip them entirely
+    from src.core.visualization import reduce_dimensions, create_3d_plot
+    from src.core.network_visualization import (
+        find_semantic_neighbors,
+        create_network_graph,
+        create_2d_scatter_with_neighbors
+    )
+    selected_indices = list(selected) if selected else None
+    query_point = None
 
+    if viz_mode == "3D Scatter Plot":
+        reduced_all = reduce_dimensions(
+            combined,
+            method=reduction_method.lower(),
+            n_components=3
+        )
+        reduced_embeddings = reduced_all[:len(embeddings)]
+        if show_query:
+            query_point = reduced_all[-1]
 
-def render_visualization_section(reduction_method: str, model_name: str):
+        fig = create_3d_plot(
+            reduced_embeddings,
+            chunks,
+            selected_indices,
+            query_point
+        )
+        return _PLOT_HTML_TEMPLATE.replace("__FIG_JSON__", fig.to_json())
+
+    if viz_mode == "2D Network Graph":
+        neighbors_dict = find_semantic_neighbors(
+            embeddings,
+            n_neighbors=n_neighbors,
+            similarity_threshold=similarity_threshold,
+            assume_normalized=True
+        )
+
+        fig = create_network_graph(
+            embeddings,
+            chunks,
+            neighbors_dict,
+            selected_indices=selected_indices,
+            layout_algorithm=layout_algo
+        )
+        return _PLOT_HTML_TEMPLATE.replace("__FIG_JSON__", fig.to_json())
+
+    # 2D Scatter with Connections
+    reduced_all = reduce_dimensions(
+        combined,
+        method=reduction_method.lower(),
+        n_components=2
+    )
+    reduced_embeddings = reduced_all[:len(embeddings)]
+    if show_query:
+        query_point = reduced_all[-1]
+
+    neighbors_dict = find_semantic_neighbors(
+        embeddings,
+        n_neighbors=n_neighbors,
+        similarity_threshold=similarity_threshold,
+        assume_normalized=True
+    )
+
+    fig = create_2d_scatter_with_neighbors(
+        reduced_embeddings,
+        chunks,
+        neighbors_dict,
+        selected_indices=selected_indices,
+        query_point=query_point,
+        reduction_method=reduction_method
+    )
+    return _PLOT_HTML_TEMPLATE.replace("__FIG_JSON__", fig.to_json())
+
+
+@st.fragment
+def render_visualization_section(reduction_method: str):
     """Render the visualization section with multiple view options
-    
+
+    Runs as a fragment: changing the in-section widgets (viz mode, the
+    neighbor/threshold sliders, layout algorithm) reruns only this block
+    instead of the whole script, and widget changes elsewhere on the page
+    don't rebuild the figure at all. Sidebar changes still trigger a full
+    rerun, which re-enters the fragment with fresh arguments.
+
     Args:
         reduction_method: Method for dimensionality reduction
-        model_name: Name of the model being used
     """
     st.subheader("🎨 Embedding Space Visualization")
     
     # Add explanation about visualization modes
-    st.markdown("""
-    <div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px; margin-bottom: 20px;'>
-        <h4 style='margin-top: 0; color: #667eea;'>📊 Understanding Visualization Modes</h4>
-        <ul style='margin-bottom: 0;'>
-            <li><b>3D Scatter Plot</b>: Shows chunks as points in 3D space. Best for seeing overall distribution and spatial relationships.</li>
-            <li><b>2D Network Graph</b>: Displays chunks as connected nodes. Best for discovering semantic clusters and relationships.</li>
-            <li><b>2D Scatter with Connections</b>: Combines spatial layout with similarity connections. Best for understanding both position and relationships.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_VIZ_INTRO_HTML)
     
     # Visualization mode selector
     viz_mode = st.radio(
@@ -40,197 +210,177 @@ def render_visualization_section(reduction_method: str, model_name: str):
         help="Choose how to visualize the embedding space"
     )
     
-    # Advanced settings in expander
-    with st.expander("⚙️ Visualization Settings", expanded=False):
-        st.markdown("""
-        <div style='background-color: rgba(255, 193, 7, 0.1); padding: 10px; border-radius: 5px; margin-bottom: 15px;'>
-            <small><b>💡 Tip:</b> Adjust these settings to control how semantic relationships are displayed.</small>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**Semantic Neighbors**")
-            st.caption("How many similar chunks to connect for each chunk")
-            n_neighbors = st.slider(
-                "Number of neighbors",
-                min_value=2,
-                max_value=10,
-                value=5,
-                help="Higher values show more connections but may clutter the visualization",
-                label_visibility="collapsed"
-            )
-            st.markdown("""
-            <small>
-            • <b>Low (2-3)</b>: Only strongest relationships<br>
-            • <b>Medium (4-6)</b>: Balanced view (recommended)<br>
-            • <b>High (7-10)</b>: Comprehensive network
-            </small>
-            """, unsafe_allow_html=True)
-            
-        with col2:
-            st.markdown("**Similarity Threshold**")
-            st.caption("Minimum similarity score to show a connection")
-            similarity_threshold = st.slider(
-                "Threshold value",
-                min_value=0.0,
-                max_value=1.0,
-                value=0.3,
-                step=0.05,
-                help="Higher values show only very similar chunks",
-                label_visibility="collapsed"
-            )
-            st.markdown("""
-            <small>
-            • <b>Low (0.2-0.4)</b>: More connections, broader view<br>
-            • <b>Medium (0.4-0.6)</b>: Balanced (recommended)<br>
-            • <b>High (0.6-0.8)</b>: Only very similar chunks
-            </small>
-            """, unsafe_allow_html=True)
-        
-        if viz_mode == "2D Network Graph":
-            st.markdown("---")
-            st.markdown("**Graph Layout Algorithm**")
-            st.caption("How to position nodes in the network")
-            layout_algo = st.selectbox(
-                "Layout algorithm",
-                options=["spring", "circular", "kamada_kawai"],
-                help="Different algorithms reveal different patterns",
-                label_visibility="collapsed"
-            )
-            st.markdown("""
-            <small>
-            • <b>Spring</b>: Natural clustering, nodes repel/attract (recommended)<br>
-            • <b>Circular</b>: Organized in a circle, good for small datasets<br>
-            • <b>Kamada-Kawai</b>: Balanced energy layout, minimizes edge crossings
-            </small>
-            """, unsafe_allow_html=True)
-    
+    # Neighbor settings only exist for the two connection-based modes; the
+    # 3D scatter neither reads them nor pays for their widget roundtrips
+    # (and None keys keep its figure cache immune to slider state)
+    n_neighbors = None
+    similarity_threshold = None
+    layout_algo = "spring"
+
+    # Advanced settings in expander. The per-option guidance lives in the
+    # widgets' help tooltips rather than separate markdown blocks, which
+    # would be shipped and parsed every rerun even with the expander shut
+    if viz_mode != "3D Scatter Plot":
+        with st.expander("⚙️ Visualization Settings", expanded=False), \
+                st.form("viz_settings_form", border=False):
+            # Form semantics double as a debounce: dragging the sliders
+            # changes nothing until Update is clicked, so a multi-stop
+            # drag costs one figure rebuild instead of one per stop
+            col1, col2 = st.columns(2)
+            with col1:
+                st.caption("How many similar chunks to connect for each chunk")
+                n_neighbors = st.slider(
+                    "Number of neighbors",
+                    min_value=2,
+                    max_value=10,
+                    value=5,
+                    help=(
+                        "Higher values show more connections but may clutter the "
+                        "visualization. Low (2-3): only strongest relationships; "
+                        "Medium (4-6): balanced view (recommended); "
+                        "High (7-10): comprehensive network."
+                    ),
+                    label_visibility="collapsed"
+                )
+
+            with col2:
+                st.caption("Minimum similarity score to show a connection")
+                similarity_threshold = st.slider(
+                    "Threshold value",
+                    min_value=0.0,
+                    max_value=1.0,
+                    value=0.3,
+                    step=0.05,
+                    help=(
+                        "Higher values show only very similar chunks. "
+                        "Low (0.2-0.4): more connections, broader view; "
+                        "Medium (0.4-0.6): balanced (recommended); "
+                        "High (0.6-0.8): only very similar chunks."
+                    ),
+                    label_visibility="collapsed"
+                )
+
+            if viz_mode == "2D Network Graph":
+                st.markdown("---")
+                st.caption("How to position nodes in the network")
+                layout_algo = st.selectbox(
+                    "Layout algorithm",
+                    options=["spring", "circular", "kamada_kawai"],
+                    help=(
+                        "Different algorithms reveal different patterns. "
+                        "Spring: natural clustering, nodes repel/attract "
+                        "(recommended); Circular: organized in a circle, good for "
+                        "small datasets; Kamada-Kawai: balanced energy layout, "
+                        "minimizes edge crossings."
+                    ),
+                    label_visibility="collapsed"
+                )
+
+            st.form_submit_button("Update visualization", use_container_width=True)
+
     with st.spinner("Creating visualization..."):
         # Get selected indices and query info
         selected_indices = None
-        query_point = None
-        
+
         if (hasattr(st.session_state, 'query_results') and
             hasattr(st.session_state, 'query_embedding') and
             st.session_state.query_results is not None and
             st.session_state.query_embedding is not None):
             result_ids = st.session_state.query_results['ids'][0]
-            selected_indices = [int(id.split('_')[1]) for id in result_ids]
-        
-        # Create visualization based on mode
-        if viz_mode == "3D Scatter Plot":
-            # Original 3D visualization
-            reduced_embeddings = reduce_dimensions(
-                st.session_state.embeddings,
-                method=reduction_method.lower(),
-                n_components=3
-            )
-            
-            if selected_indices and st.session_state.query_embedding is not None:
-                model = load_model(model_name)
-                combined = np.vstack([st.session_state.embeddings,
-                                     st.session_state.query_embedding.reshape(1, -1)])
-                reduced_combined = reduce_dimensions(combined, method=reduction_method.lower(), n_components=3)
-                query_point = reduced_combined[-1]
-            
-            fig = create_3d_plot(
-                reduced_embeddings,
-                st.session_state.chunks,
-                selected_indices,
-                query_point
-            )
-            
-        elif viz_mode == "2D Network Graph":
-            # Network graph visualization
-            neighbors_dict = find_semantic_neighbors(
-                st.session_state.embeddings,
-                n_neighbors=n_neighbors,
-                similarity_threshold=similarity_threshold
-            )
-            
-            fig = create_network_graph(
-                st.session_state.embeddings,
-                st.session_state.chunks,
-                neighbors_dict,
-                selected_indices=selected_indices,
-                layout_algorithm=layout_algo
-            )
-            
-        else:  # 2D Scatter with Connections
-            # 2D scatter with neighbor connections
-            reduced_embeddings = reduce_dimensions(
-                st.session_state.embeddings,
-                method=reduction_method.lower(),
-                n_components=2
-            )
-            
-            neighbors_dict = find_semantic_neighbors(
-                st.session_state.embeddings,
-                n_neighbors=n_neighbors,
-                similarity_threshold=similarity_threshold
-            )
-            
-            if selected_indices and st.session_state.query_embedding is not None:
-                model = load_model(model_name)
-                combined = np.vstack([st.session_state.embeddings,
-                                     st.session_state.query_embedding.reshape(1, -1)])
-                reduced_combined = reduce_dimensions(combined, method=reduction_method.lower(), n_components=2)
-                query_point = reduced_combined[-1]
-            
-            fig = create_2d_scatter_with_neighbors(
-                reduced_embeddings,
-                st.session_state.chunks,
-                neighbors_dict,
-                selected_indices=selected_indices,
-                query_point=query_point,
-                reduction_method=reduction_method
+            # "chunk_5" -> 5, parsed in one vectorized pass instead of a
+            # per-id Python split loop
+            selected_indices = np.char.partition(
+                np.asarray(result_ids), '_'
+            )[:, 2].astype(np.int64).tolist()
+
+        embeddings = st.session_state.embeddings
+        show_query = bool(selected_indices) and st.session_state.query_embedding is not None
+        selected = tuple(selected_indices) if selected_indices else ()
+
+        # Session-level memo in front of the st.cache_data machinery: for
+        # the dominant same-view rerun a plain dict lookup on object
+        # identity replaces fingerprinting N x D bytes and hashing the
+        # cache key. Each entry stores the arrays it was built from, which
+        # keeps them alive — so the id()s in live keys can never be
+        # recycled by a later allocation and a stale hit is impossible.
+        query_embedding = st.session_state.query_embedding if show_query else None
+        viz_key = (id(embeddings), id(query_embedding), viz_mode, reduction_method,
+                   n_neighbors, similarity_threshold, layout_algo, selected)
+        viz_cache = st.session_state.setdefault('viz_html_cache', {})
+        # Entries for a replaced corpus can never hit again; drop them so
+        # they stop pinning the old arrays
+        for stale_key in [k for k in viz_cache if k[0] != id(embeddings)]:
+            del viz_cache[stale_key]
+
+        entry = viz_cache.get(viz_key)
+        plot_html = entry[2] if entry is not None else None
+        if plot_html is None:
+            # Precomputed unit-norm float32 companion for the similarity
+            # paths; built lazily for sessions from before the ingest step
+            # stored it
+            normalized = st.session_state.get('embeddings_normalized')
+            if normalized is None:
+                normalized = np.ascontiguousarray(embeddings, dtype=np.float32)
+                norms = np.linalg.norm(normalized, axis=1, keepdims=True).clip(min=1e-12)
+                normalized = normalized / norms
+                st.session_state.embeddings_normalized = normalized
+
+            # Reduce once: when a query is active its embedding rides along
+            # as the last row, so we never fit PCA/UMAP twice per view
+            if show_query:
+                # Reusable (N+1, D) float32 buffer: the corpus rows are
+                # copied in once per corpus and only the query row is
+                # rewritten, instead of vstack re-copying N x D
+                buf = st.session_state.get('combined_buf')
+                if (buf is None
+                        or st.session_state.get('combined_buf_src') is not embeddings
+                        or buf.shape != (len(embeddings) + 1, embeddings.shape[1])):
+                    buf = np.empty((len(embeddings) + 1, embeddings.shape[1]), dtype=np.float32)
+                    buf[:-1] = embeddings
+                    st.session_state.combined_buf = buf
+                    st.session_state.combined_buf_src = embeddings
+                buf[-1] = st.session_state.query_embedding
+                combined = buf
+            else:
+                # Keep the reduction input float32: encode() already emits
+                # float32, so this is a no-op copy-wise, but it guards
+                # against a float64 upcast doubling PCA/UMAP memory traffic
+                # (and the fingerprint then always hashes one byte layout)
+                combined = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+            fingerprint = hashlib.blake2b(
+                combined.tobytes(), digest_size=16
+            ).hexdigest()
+
+            plot_html = _cached_figure_html(
+                fingerprint,
+                viz_mode,
+                reduction_method,
+                n_neighbors,
+                similarity_threshold,
+                layout_algo,
+                selected,
+                show_query,
+                normalized,
+                combined,
+                st.session_state.chunks
             )
-        
-        st.plotly_chart(fig, use_container_width=True)
+            viz_cache[viz_key] = (embeddings, query_embedding, plot_html)
+            # Oldest-first eviction keeps the memo (and the arrays its
+            # entries pin) bounded as view combinations accumulate
+            while len(viz_cache) > _VIZ_HTML_CACHE_MAX:
+                del viz_cache[next(iter(viz_cache))]
+
+        # Prebuilt HTML straight to the frontend: no per-rerun figure
+        # re-serialization and no plotly element wrapper to reconcile
+        st.components.v1.html(plot_html, height=700)
         
         # Add detailed explanation based on visualization mode
         st.markdown("---")
         if viz_mode == "2D Network Graph":
-            st.markdown("""
-            <div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
-                <h4 style='margin-top: 0; color: #667eea;'>🕸️ How to Read the Network Graph</h4>
-                <ul style='margin-bottom: 0;'>
-                    <li><b>Nodes (circles)</b>: Each represents a text chunk</li>
-                    <li><b>Lines (edges)</b>: Connect semantically similar chunks</li>
-                    <li><b>Line thickness</b>: Thicker = higher similarity</li>
-                    <li><b>Node clusters</b>: Groups of related content</li>
-                    <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query</li>
-                    <li><b>Hover</b>: See chunk content and its similar neighbors</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            st.html(_READ_NETWORK_HTML)
         elif viz_mode == "2D Scatter with Connections":
-            st.markdown("""
-            <div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
-                <h4 style='margin-top: 0; color: #667eea;'>📍 How to Read the 2D Scatter Plot</h4>
-                <ul style='margin-bottom: 0;'>
-                    <li><b>Position</b>: Shows embedding space after dimensionality reduction</li>
-                    <li><b>Proximity</b>: Closer points = more semantically similar</li>
-                    <li><b>Lines</b>: Connect chunks above similarity threshold</li>
-                    <li><b>Line opacity</b>: More opaque = higher similarity</li>
-                    <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query</li>
-                    <li><b>Axes</b>: Principal components from PCA/UMAP reduction</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            st.html(_READ_2D_HTML)
         else:
-            st.markdown("""
-            <div style='background-color: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px;'>
-                <h4 style='margin-top: 0; color: #667eea;'>🎯 How to Read the 3D Scatter Plot</h4>
-                <ul style='margin-bottom: 0;'>
-                    <li><b>Each point</b>: Represents one text chunk in 3D space</li>
-                    <li><b>Position</b>: Determined by embedding similarity (closer = more similar)</li>
-                    <li><b>Colors</b>: 🟣 Regular chunks | 🔴 Retrieved chunks | 🟡 Query point</li>
-                    <li><b>Interaction</b>: Rotate, zoom, and hover to explore</li>
-                    <li><b>Axes</b>: Three principal components from dimensionality reduction</li>
-                    <li><b>Clusters</b>: Groups of points indicate related content</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            st.html(_READ_3D_HTML)
 